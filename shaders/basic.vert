@@ -1,9 +1,15 @@
 #version 330
 in vec3 in_pos;
 in vec3 in_color;
-uniform mat4 Mvp;
+// cámara compartida entre programas (ver CameraUniformBlock en src/camera.py)
+layout(std140) uniform Camera {
+    mat4 uView; mat4 uProj; mat4 uViewProj; mat4 uInvView; mat4 uInvProj;
+    vec4 uEye;
+    vec4 uLens;
+};
+uniform mat4 uModel;
 out vec3 v_color;
 void main(){
-    gl_Position = Mvp * vec4(in_pos, 1.0);
+    gl_Position = uViewProj * uModel * vec4(in_pos, 1.0);
     v_color = in_color;
-}
\ No newline at end of file
+}
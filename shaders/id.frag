@@ -0,0 +1,7 @@
+#version 330
+// Escribe el ID del objeto (0 = fondo) en un attachment entero R32UI
+uniform uint uId;
+out uint f_id;
+void main(){
+    f_id = uId;
+}
@@ -0,0 +1,12 @@
+#version 330
+// Pasada de IDs (picking por GPU): sólo posición
+in vec3 in_pos;
+layout(std140) uniform Camera {
+    mat4 uView; mat4 uProj; mat4 uViewProj; mat4 uInvView; mat4 uInvProj;
+    vec4 uEye;
+    vec4 uLens;
+};
+uniform mat4 uModel;
+void main(){
+    gl_Position = uViewProj * uModel * vec4(in_pos, 1.0);
+}
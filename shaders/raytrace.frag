@@ -3,13 +3,27 @@
 in vec2 v_ndc;
 out vec4 f_color;
 
-// ---- Uniforms de cámara ----
-uniform mat4 uInvView;    // inversa de la view (para pasar de cam a mundo)
-uniform float uFov;       // fov en radianes
-uniform float uAspect;    // ancho/alto
+// ---- Cámara compartida (ver CameraUniformBlock en src/camera.py) ----
+layout(std140) uniform Camera {
+    mat4 uView; mat4 uProj; mat4 uViewProj;
+    mat4 uInvView;    // inversa de la view (para pasar de cam a mundo)
+    mat4 uInvProj;
+    vec4 uEye;
+    vec4 uLens;       // x = fov en radianes, y = ancho/alto, z = near, w = far
+};
 
-// ---- Luz ----
-uniform vec3 uLightPos;   // posición de luz en mundo
+// ---- Luces (muchas, con culling por tiles en CPU) ----
+#define MAX_LIGHTS 256
+layout(std140) uniform Lights {
+    vec4 uLightPosRange[MAX_LIGHTS];  // xyz = posición en mundo, w = alcance
+    vec4 uLightColor[MAX_LIGHTS];     // rgb = color/intensidad
+};
+// grilla de tiles de pantalla (ver src/raytracing/lights.py)
+uniform int uTileSize;                // píxeles por lado de tile
+uniform isampler2D uTileHeader;       // (offset, cantidad) por tile
+uniform isampler2D uTileIndex;        // índices de luz, filas de ancho fijo
+uniform int uLightCount;              // total (rebotes: sus puntos no están en el tile)
+uniform vec2 uResolution;             // tamaño de pantalla en píxeles (para el tile)
 
 // ---- Escena simple ----
 // esfera
@@ -18,6 +32,20 @@ uniform float uSphereRadius;
 // plano y= y0
 uniform float uPlaneY;
 
+// ---- Materiales (reflexión / refracción) ----
+uniform float uSphereReflect;   // fracción especular (espejo)
+uniform float uSphereTransmit;  // fracción transmitida (vidrio)
+uniform float uSphereIOR;       // índice de refracción
+uniform float uPlaneReflect;
+
+// ---- Rebotes ----
+uniform int   uMaxDepth;        // rebotes máximos (0 = sólo rayo primario)
+uniform float uMinThroughput;   // cortar cuando el aporte restante es menor
+uniform float uBounceBudget;    // rebotes por píxel que permite el presupuesto global (fraccional)
+uniform bool  uOutputBounces;   // pasada de estadísticas: escribir rebotes en vez de color
+
+const vec3 BACKGROUND = vec3(0.08, 0.09, 0.12);
+
 // helpers
 const float EPS = 1e-4;
 
@@ -67,6 +95,14 @@ vec3 shade(vec3 p, vec3 n, vec3 albedo, vec3 lightPos, vec3 eye) {
     return (kd + ks) * att;
 }
 
+// ventana suave que llega a 0 en el alcance de la luz (así el culling es exacto)
+float range_window(float dist, float range) {
+    float x = clamp(dist / range, 0.0, 1.0);
+    float x2 = x * x;
+    float w = clamp(1.0 - x2 * x2, 0.0, 1.0);
+    return w * w;
+}
+
 // (opcional) sombra dura: rayo hacia la luz
 bool in_shadow(vec3 p, vec3 lightPos) {
     vec3 ro = p + normalize(lightPos - p) * EPS*4.0;
@@ -83,18 +119,8 @@ bool in_shadow(vec3 p, vec3 lightPos) {
     return false;
 }
 
-void main() {
-    // 1) construir rayo en espacio de cámara desde NDC
-    // v_ndc llega en [-1,1]. Para cámara pinhole:
-    float halfTan = tan(uFov * 0.5);
-    vec3 dir_cam = normalize(vec3(v_ndc.x * halfTan * uAspect,
-                                  v_ndc.y * halfTan,
-                                  -1.0));
-    // 2) pasar a mundo con invView (vector = w=0)
-    vec3 ro = vec3(uInvView[3]);  // origen = eye (col 3 de invView)
-    vec3 rd = normalize((uInvView * vec4(dir_cam, 0.0)).xyz);
-
-    // 3) intersectar escena
+// intersección más cercana contra toda la escena
+Hit trace_scene(vec3 ro, vec3 rd) {
     Hit best; best.t = 1e20; best.id = 0;
 
     float t;
@@ -110,21 +136,130 @@ void main() {
         best.n = vec3(0.0, 1.0, 0.0);
         best.id = 2;
     }
+    return best;
+}
 
-    if (best.id == 0) {
-        // fondo
-        f_color = vec4(0.08, 0.09, 0.12, 1.0);
-        return;
+// aporte de una luz (con alcance y sombra dura)
+vec3 light_contrib(int li, Hit h, vec3 n, vec3 albedo, vec3 eye) {
+    vec3  lightPos = uLightPosRange[li].xyz;
+    float range    = uLightPosRange[li].w;
+
+    float dist = length(lightPos - h.p);
+    if (dist >= range) return vec3(0.0);   // el tile es conservador: descartar por píxel
+
+    vec3 lc = shade(h.p, n, albedo, lightPos, eye) * uLightColor[li].rgb
+            * range_window(dist, range);
+    if (in_shadow(h.p, lightPos)) lc *= 0.35;
+    return lc;
+}
+
+// luz directa: el hit primario usa la lista del tile; los rebotes caen en
+// cualquier lugar, así que recorren todas (y descartan por alcance)
+vec3 direct_light(Hit h, vec3 n, vec3 albedo, vec3 eye, bool primary) {
+    vec3 c = vec3(0.0);
+    if (primary) {
+        ivec2 tile = ivec2((v_ndc * 0.5 + 0.5) * uResolution) / uTileSize;
+        ivec2 hdr = texelFetch(uTileHeader, tile, 0).rg;
+        int indexWidth = textureSize(uTileIndex, 0).x;
+        for (int k = 0; k < hdr.y; ++k) {
+            int e = hdr.x + k;
+            c += light_contrib(texelFetch(uTileIndex, ivec2(e % indexWidth, e / indexWidth), 0).r,
+                               h, n, albedo, eye);
+        }
+    } else {
+        for (int li = 0; li < uLightCount; ++li) {
+            c += light_contrib(li, h, n, albedo, eye);
+        }
     }
+    return c;
+}
 
-    // 4) color por material simple
-    vec3 albedo = (best.id == 1) ? vec3(0.9, 0.3, 0.3) : vec3(0.7, 0.7, 0.7);
+float fresnel_schlick(float cosi, float ior) {
+    float r0 = (1.0 - ior) / (1.0 + ior);
+    r0 *= r0;
+    return r0 + (1.0 - r0) * pow(1.0 - cosi, 5.0);
+}
 
-    // 5) sombra dura (opcional): comentar si no querés sombra
-    bool shadow = in_shadow(best.p, uLightPos);
+// hash por píxel para repartir la parte fraccional del presupuesto
+float pixel_hash(vec2 p) {
+    return fract(sin(dot(p, vec2(12.9898, 78.233))) * 43758.5453);
+}
+
+void main() {
+    // 1) construir rayo en espacio de cámara desde NDC
+    // v_ndc llega en [-1,1]. Para cámara pinhole:
+    float halfTan = tan(uLens.x * 0.5);
+    vec3 dir_cam = normalize(vec3(v_ndc.x * halfTan * uLens.y,
+                                  v_ndc.y * halfTan,
+                                  -1.0));
+    // 2) pasar a mundo con invView (vector = w=0)
+    vec3 ro = vec3(uInvView[3]);  // origen = eye (col 3 de invView)
+    vec3 rd = normalize((uInvView * vec4(dir_cam, 0.0)).xyz);
+
+    // 3) tope de rebotes: profundidad máxima y presupuesto global repartido
+    //    entre píxeles (floor + 1 extra con probabilidad = parte fraccional)
+    float budget = max(uBounceBudget, 0.0);
+    int maxBounces = min(uMaxDepth, int(floor(budget)) + (pixel_hash(v_ndc) < fract(budget) ? 1 : 0));
+
+    // 4) camino iterativo (sin recursión): un solo lóbulo por rebote
+    vec3 color = vec3(0.0);
+    vec3 throughput = vec3(1.0);
+    int bounces = 0;
 
-    vec3 c = shade(best.p, best.n, albedo, uLightPos, ro);
-    if (shadow) c *= 0.35;
+    for (int depth = 0; depth <= maxBounces; ++depth) {
+        Hit h = trace_scene(ro, rd);
+        if (h.id == 0) {
+            color += throughput * BACKGROUND;
+            break;
+        }
 
-    f_color = vec4(c, 1.0);
-}
\ No newline at end of file
+        // material
+        vec3 albedo  = (h.id == 1) ? vec3(0.9, 0.3, 0.3) : vec3(0.7, 0.7, 0.7);
+        float refl   = (h.id == 1) ? uSphereReflect  : uPlaneReflect;
+        float transm = (h.id == 1) ? uSphereTransmit : 0.0;
+
+        // normal hacia el lado del rayo (adentro de la esfera: invertida)
+        bool inside = dot(rd, h.n) > 0.0;
+        vec3 n = inside ? -h.n : h.n;
+        float cosi = clamp(-dot(rd, n), 0.0, 1.0);
+
+        // Fresnel mueve parte de lo transmitido a reflejado
+        if (transm > 0.0) {
+            float F = fresnel_schlick(cosi, uSphereIOR);
+            refl += transm * F;
+            transm *= 1.0 - F;
+        }
+
+        float diffuse = max(1.0 - refl - transm, 0.0);
+        if (diffuse > 0.0 && !inside) {
+            color += throughput * diffuse * direct_light(h, n, albedo, ro, depth == 0);
+        }
+
+        if (depth == maxBounces || refl + transm <= 0.0) break;
+
+        // seguir el lóbulo dominante; el otro se descarta (sin pila)
+        vec3 next_rd;
+        if (transm > refl) {
+            float eta = inside ? uSphereIOR : 1.0 / uSphereIOR;
+            next_rd = refract(rd, n, eta);
+            if (dot(next_rd, next_rd) < 1e-6) {   // reflexión total interna
+                next_rd = reflect(rd, n);
+            }
+            throughput *= transm * (h.id == 1 ? mix(vec3(1.0), albedo, 0.15) : vec3(1.0));
+        } else {
+            next_rd = reflect(rd, n);
+            throughput *= refl;
+        }
+        rd = normalize(next_rd);
+        ro = h.p + n * (dot(rd, n) > 0.0 ? EPS : -EPS) * 4.0;   // del lado hacia donde sigue
+        ++bounces;
+
+        if (max(throughput.r, max(throughput.g, throughput.b)) < uMinThroughput) break;
+    }
+
+    if (uOutputBounces) {
+        f_color = vec4(float(bounces), 0.0, 0.0, 1.0);
+        return;
+    }
+    f_color = vec4(color, 1.0);
+}
@@ -1,6 +1,13 @@
+import numpy as np
+import moderngl
 import glm
 
 class Camera:
+    """
+    Cámara perspectiva con matrices cacheadas: view, projection, view-projection
+    y sus inversas se recalculan sólo cuando cambian eye/target/up/fov/aspect/near/far
+    (incluso si se modifican in-place, ej. cam.eye.x += 1).
+    """
     def __init__(self, fov_deg: float = 60.0, aspect: float = 16/9, near: float = 0.1, far: float = 100.0):
         self.fov_deg = fov_deg
         self.aspect = aspect
@@ -10,13 +17,45 @@ class Camera:
         self.target = glm.vec3(0.0, 0.0, 0.0)
         self.up = glm.vec3(0.0, 1.0, 0.0)
 
+        self._key = None
+        self.version = 0   # sube cada vez que se recalculan las matrices
+
+    def _update(self):
+        key = (*self.eye, *self.target, *self.up, self.fov_deg, self.aspect, self.near, self.far)
+        if key == self._key:
+            return
+        self._key = key
+        self._view = glm.lookAt(self.eye, self.target, self.up)
+        self._proj = glm.perspective(glm.radians(self.fov_deg), self.aspect, self.near, self.far)
+        self._view_proj = self._proj * self._view
+        self._inv_view = glm.inverse(self._view)
+        self._inv_proj = glm.inverse(self._proj)
+        self.version += 1
+
     @property
     def projection(self) -> glm.mat4:
-        return glm.perspective(glm.radians(self.fov_deg), self.aspect, self.near, self.far)
+        self._update()
+        return self._proj
 
     @property
     def view(self) -> glm.mat4:
-        return glm.lookAt(self.eye, self.target, self.up)
+        self._update()
+        return self._view
+
+    @property
+    def view_projection(self) -> glm.mat4:
+        self._update()
+        return self._view_proj
+
+    @property
+    def inv_view(self) -> glm.mat4:
+        self._update()
+        return self._inv_view
+
+    @property
+    def inv_projection(self) -> glm.mat4:
+        self._update()
+        return self._inv_proj
 
     def set_aspect(self, aspect: float):
         self.aspect = max(1e-5, float(aspect))
@@ -33,9 +72,62 @@ class Camera:
         z = -1.0
         dir_cam = glm.normalize(glm.vec3(x, y, z))
 
-        inv_view = glm.inverse(self.view)
-        d4 = inv_view * glm.vec4(dir_cam, 0.0)   # vector → w=0
+        d4 = self.inv_view * glm.vec4(dir_cam, 0.0)   # vector → w=0
         dir_world = glm.normalize(glm.vec3(d4.x, d4.y, d4.z))
         origin_world = glm.vec3(self.eye)
 
-        return origin_world, dir_world
\ No newline at end of file
+        return origin_world, dir_world
+
+
+class CameraUniformBlock:
+    """
+    Uniform buffer compartido por todos los programas (basic, id, raytrace):
+
+        layout(std140) uniform Camera {
+            mat4 uView; mat4 uProj; mat4 uViewProj; mat4 uInvView; mat4 uInvProj;
+            vec4 uEye;    // xyz = posición de la cámara
+            vec4 uLens;   // fov (rad), aspect, near, far
+        };
+
+    Se publica una vez por frame; si la cámara no cambió no se vuelve a escribir.
+    Uno por contexto: usar CameraUniformBlock.shared(ctx).
+    Binding 2: el 0 es el WindowBlock de pyglet (HUD, labels) y el 1 es Lights.
+    """
+    BINDING = 2
+    SIZE = 5 * 64 + 2 * 16
+
+    _shared = {}
+
+    @classmethod
+    def shared(cls, ctx: moderngl.Context) -> "CameraUniformBlock":
+        block = cls._shared.get(id(ctx))
+        if block is None or block.ctx is not ctx:
+            block = cls._shared[id(ctx)] = cls(ctx)
+        return block
+
+    def __init__(self, ctx: moderngl.Context, binding: int = BINDING):
+        self.ctx = ctx
+        self.binding = binding
+        self.buffer = ctx.buffer(reserve=self.SIZE)
+        self.buffer.bind_to_uniform_block(binding)
+        self._published = None   # (id de cámara, versión) del último write
+
+    def bind(self, program):
+        """Conecta el bloque 'Camera' de un programa (ShaderProgram o moderngl.Program)."""
+        prog = getattr(program, "program", program)
+        if "Camera" in prog:
+            prog["Camera"].binding = self.binding
+
+    def publish(self, camera: Camera):
+        camera._update()
+        stamp = (id(camera), camera.version)
+        if stamp == self._published:
+            return
+        data = np.empty(self.SIZE // 4, dtype="f4")
+        for k, m in enumerate((camera._view, camera._proj, camera._view_proj,
+                               camera._inv_view, camera._inv_proj)):
+            data[16 * k: 16 * (k + 1)] = np.array(m.to_list(), dtype="f4").reshape(16)   # column-major
+        data[80:84] = (*camera.eye, 1.0)
+        data[84:88] = (glm.radians(camera.fov_deg), camera.aspect, camera.near, camera.far)
+        self.buffer.write(data.tobytes())
+        self._published = stamp
@@ -12,9 +12,10 @@ class Graphics:
         self.ctx = ctx
         self.shader = shader  # instancia de ShaderProgram (tiene .program)
 
-        # Buffers
-        self.vbo = self.ctx.buffer(vertices.tobytes())
-        self.ibo = self.ctx.buffer(indices.tobytes())
+        # Buffers: se suben directo desde el array (sin copia intermedia con
+        # tobytes), así un np.memmap del cache binario va derecho a la GPU
+        self.vbo = self.ctx.buffer(np.ascontiguousarray(vertices, dtype="f4"))
+        self.ibo = self.ctx.buffer(np.ascontiguousarray(indices, dtype="i4"))
 
         # VAO describiendo layout "3f 3f"
         self.vao = self.ctx.vertex_array(
@@ -25,6 +26,26 @@ class Graphics:
             self.ibo,
             index_element_size=4,  # int32
         )
+        # VAOs extra (otros programas sobre los mismos buffers), ver vao_for()
+        self._extra_vaos = {}
+
+    def vao_for(self, shader) -> moderngl.VertexArray:
+        """
+        VAO que reutiliza el mismo VBO/IBO con otro programa que sólo lee
+        in_pos (ej. la pasada de IDs del picking). Se crea una vez y se cachea.
+        """
+        vao = self._extra_vaos.get(shader)
+        if vao is None:
+            vao = self.ctx.vertex_array(
+                shader.program,
+                [
+                    (self.vbo, "3f 12x", "in_pos"),  # salteamos in_color
+                ],
+                self.ibo,
+                index_element_size=4,
+            )
+            self._extra_vaos[shader] = vao
+        return vao
 
     def render(self):
         self.vao.render(mode=moderngl.TRIANGLES)
\ No newline at end of file
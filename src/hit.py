@@ -67,8 +67,11 @@ class HitBox(Hit):  # AABB en mundo
 
 
 class HitBoxOBB(Hit):  # OBB: transforma el rayo al espacio local del objeto
-    def __init__(self, get_model_matrix):
+    def __init__(self, get_model_matrix, local_min=(-1.0, -1.0, -1.0), local_max=(1.0, 1.0, 1.0)):
         super().__init__(get_model_matrix)
+        # caja local del objeto (por defecto el cubo [-1,1] de Cube)
+        self._center = (glm.vec3(local_min) + glm.vec3(local_max)) * 0.5
+        self._half = (glm.vec3(local_max) - glm.vec3(local_min)) * 0.5
 
     def check_hit(self, ray_origin, ray_dir):
         M = self.model_matrix
@@ -76,11 +79,11 @@ class HitBoxOBB(Hit):  # OBB: transforma el rayo al espacio local del objeto
 
         o4 = invM * glm.vec4(ray_origin, 1.0)  # punto
         d4 = invM * glm.vec4(ray_dir,    0.0)  # vector
-        o = glm.vec3(o4.x, o4.y, o4.z)
+        o = glm.vec3(o4.x, o4.y, o4.z) - self._center
         d = glm.normalize(glm.vec3(d4.x, d4.y, d4.z))
 
         # el cubo local es [-1,1] -> half local = (1,1,1)
-        base_half = glm.vec3(1.0)
+        base_half = self._half
         half = base_half * self.scale   # NO 0.5
         half += glm.vec3(3e-4)  # o 5e-4 si tu GPU/driver es muy quisquilloso
         bmin = -half
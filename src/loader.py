@@ -0,0 +1,288 @@
+# src/loader.py
+"""
+Carga de escenas/mallas con cache binario mapeado en memoria.
+
+La primera vez se parsea el archivo de texto (OBJ, o una escena .json que
+referencia OBJs con transformaciones) y se escribe un cache binario al lado:
+    <archivo>.cgbin
+Las cargas siguientes hacen mmap del cache y devuelven vistas numpy sobre él
+(sin copias): Graphics las sube directo a VBO/IBO.
+
+Formato .cgbin (little-endian, bloques alineados a 16 bytes):
+    header   : magic "CGSC", versión u32, n_objetos u32, reservado u32,
+               tamaño u64 y mtime_ns u64 de las fuentes, hash blake2b (32 bytes)
+    tabla    : por objeto -> nombre (32 bytes), offset/cantidad de vértices,
+               offset/cantidad de índices, modelo 4x4 f4 (column-major)
+    datos    : vértices "3f 3f" intercalados (pos + color) e índices int32
+"""
+import hashlib
+import json
+import mmap
+import struct
+from pathlib import Path
+
+import numpy as np
+import glm
+
+MAGIC = b"CGSC"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sIII QQ 32s")
+_STAT = struct.Struct("<QQ")   # tamaño / mtime_ns dentro del header
+_STAT_OFFSET = struct.calcsize("<4sIII")
+_ENTRY = np.dtype([
+    ("name", "S32"),
+    ("v_offset", "<u8"), ("v_count", "<u8"),
+    ("i_offset", "<u8"), ("i_count", "<u8"),
+    ("model", "<f4", (16,)),
+])
+_ALIGN = 16
+
+
+class MeshRecord:
+    """Un objeto de la escena: vistas (N,6) f4 / (M,) i4 sobre el cache y su modelo."""
+    __slots__ = ("name", "vertices", "indices", "model")
+
+    def __init__(self, name: str, vertices: np.ndarray, indices: np.ndarray, model: glm.mat4):
+        self.name = name
+        self.vertices = vertices
+        self.indices = indices
+        self.model = model
+
+
+class SceneData:
+    """Resultado de load_scene(): lista de objetos + el mmap que los respalda."""
+    def __init__(self, objects, source_mmap=None):
+        self.objects = objects
+        self._mmap = source_mmap  # mantener vivo mientras se usen las vistas
+
+    def close(self):
+        # soltar las vistas antes de cerrar el mmap; si alguien todavía tiene
+        # una vista (ej. un Mesh), el mmap se libera cuando se suelte la última
+        self.objects = []
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+            self._mmap = None
+
+
+# ---------------- API ----------------
+def load_scene(path, cache_path=None, verbose: bool = True) -> SceneData:
+    """
+    Carga una escena (.json) o malla (.obj). Usa el cache binario si está al día;
+    si no, importa el texto y regenera el cache.
+    """
+    path = Path(path)
+    cache_path = Path(cache_path) if cache_path else path.with_name(path.name + ".cgbin")
+    sources = _source_files(path)
+
+    data = _open_cache(cache_path, sources)
+    if data is not None:
+        if verbose:
+            print(f"[Loader] cache {cache_path.name}: {len(data.objects)} objetos (mmap)")
+        return data
+
+    objects = _import_text(path)
+    _write_cache(cache_path, objects, sources)
+    if verbose:
+        n_tris = sum(len(o.indices) // 3 for o in objects)
+        print(f"[Loader] importado {path.name}: {len(objects)} objetos, {n_tris} triángulos → {cache_path.name}")
+    data = _open_cache(cache_path, sources)
+    return data if data is not None else SceneData(objects)
+
+
+def add_to_scene(scene, ctx, shader, data: SceneData):
+    """Crea Mesh + Graphics por objeto y los agrega a la escena."""
+    from src.graphics import Graphics
+    from src.mesh import Mesh
+
+    for rec in data.objects:
+        obj = Mesh(rec.name, rec.vertices, rec.indices, rec.model)
+        scene.add(obj, Graphics(ctx, shader, rec.vertices, rec.indices))
+    return scene
+
+
+# ---------------- cache binario ----------------
+def _source_files(path: Path):
+    if path.suffix.lower() == ".json":
+        desc = json.loads(path.read_text(encoding="utf-8"))
+        meshes = sorted({o["mesh"] for o in desc.get("objects", [])})
+        return [path] + [(path.parent / m) for m in meshes]
+    return [path]
+
+
+def _stat_key(sources):
+    size, mtime = 0, 0
+    for p in sources:
+        st = p.stat()
+        size += st.st_size
+        mtime = max(mtime, st.st_mtime_ns)
+    return size, mtime
+
+
+def _content_hash(sources) -> bytes:
+    h = hashlib.blake2b(digest_size=32)
+    for p in sources:
+        with open(p, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.digest()
+
+
+def _align(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _write_cache(cache_path: Path, objects, sources):
+    size, mtime = _stat_key(sources)
+    digest = _content_hash(sources)
+
+    table = np.zeros(len(objects), dtype=_ENTRY)
+    offset = _align(_HEADER.size + table.nbytes)
+    for k, o in enumerate(objects):
+        table[k]["name"] = o.name.encode("utf-8")[:32]
+        table[k]["v_offset"] = offset
+        table[k]["v_count"] = len(o.vertices)
+        offset = _align(offset + o.vertices.nbytes)
+        table[k]["i_offset"] = offset
+        table[k]["i_count"] = len(o.indices)
+        offset = _align(offset + o.indices.nbytes)
+        table[k]["model"] = np.array(o.model.to_list(), dtype="f4").reshape(16)
+
+    tmp = cache_path.with_name(cache_path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(objects), 0, size, mtime, digest))
+        f.write(table.tobytes())
+        for k, o in enumerate(objects):
+            for arr, off in ((o.vertices, table[k]["v_offset"]), (o.indices, table[k]["i_offset"])):
+                f.write(b"\0" * (int(off) - f.tell()))
+                f.write(np.ascontiguousarray(arr).tobytes())
+        f.write(b"\0" * (offset - f.tell()))
+    tmp.replace(cache_path)  # atómico: nunca queda un cache a medio escribir
+
+
+def _open_cache(cache_path: Path, sources):
+    """Devuelve SceneData sobre el mmap, o None si no existe / está desactualizado."""
+    if not cache_path.exists():
+        return None
+    with open(cache_path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # archivo vacío
+            return None
+
+    if len(mm) < _HEADER.size:
+        mm.close()
+        return None
+    magic, version, n, _, size, mtime, digest = _HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or version != VERSION:
+        mm.close()
+        return None
+
+    # chequeo rápido por stat; si difiere, se decide por el hash de contenido
+    try:
+        key = _stat_key(sources)
+        if key != (size, mtime):
+            if digest != _content_hash(sources):
+                mm.close()
+                return None
+            _refresh_stat(cache_path, key)
+    except OSError:
+        pass  # fuente borrada: el cache sigue siendo válido por sí mismo
+
+    table = np.frombuffer(mm, dtype=_ENTRY, count=n, offset=_HEADER.size)
+    objects = []
+    for e in table:
+        verts = np.frombuffer(mm, dtype="<f4", count=int(e["v_count"]) * 6,
+                              offset=int(e["v_offset"])).reshape(-1, 6)
+        inds = np.frombuffer(mm, dtype="<i4", count=int(e["i_count"]), offset=int(e["i_offset"]))
+        model = glm.mat4(*map(float, e["model"]))
+        objects.append(MeshRecord(e["name"].decode("utf-8", "replace"), verts, inds, model))
+    return SceneData(objects, mm)
+
+
+def _refresh_stat(cache_path: Path, key):
+    """
+    Mismo contenido con otro stat (touch, checkout, copia): se reescribe sólo
+    tamaño/mtime del header para que la próxima carga no vuelva a hashear.
+    """
+    try:
+        with open(cache_path, "r+b") as f:
+            f.seek(_STAT_OFFSET)
+            f.write(_STAT.pack(*key))
+    except OSError:
+        pass  # cache de sólo lectura: sigue valiendo, sólo se pierde el atajo
+
+
+# ---------------- importadores de texto ----------------
+def _import_text(path: Path):
+    if path.suffix.lower() == ".json":
+        return _import_scene_json(path)
+    return _import_obj(path, glm.mat4(1.0))
+
+
+def _import_scene_json(path: Path):
+    """
+    Escena simple:
+      {"objects": [{"name": "A", "mesh": "cubo.obj",
+                    "position": [x,y,z], "rotation_y": grados, "scale": s}, ...]}
+    """
+    desc = json.loads(path.read_text(encoding="utf-8"))
+    meshes = {}
+    objects = []
+    for k, o in enumerate(desc.get("objects", [])):
+        mesh_path = path.parent / o["mesh"]
+        if mesh_path not in meshes:
+            meshes[mesh_path] = _parse_obj(mesh_path)
+        verts, inds = meshes[mesh_path]
+
+        M = glm.translate(glm.mat4(1.0), glm.vec3(*o.get("position", (0.0, 0.0, 0.0))))
+        M = M * glm.rotate(glm.mat4(1.0), glm.radians(float(o.get("rotation_y", 0.0))), glm.vec3(0, 1, 0))
+        M = M * glm.scale(glm.mat4(1.0), glm.vec3(float(o.get("scale", 1.0))))
+        objects.append(MeshRecord(o.get("name", f"Obj{k}"), verts, inds, M))
+    return objects
+
+
+def _import_obj(path: Path, model: glm.mat4):
+    verts, inds = _parse_obj(path)
+    return [MeshRecord(path.stem, verts, inds, model)]
+
+
+def _parse_obj(path: Path):
+    """
+    OBJ mínimo: 'v x y z [r g b]' y 'f a b c ...' (a = v, v/vt, v//vn o v/vt/vn,
+    índices negativos relativos). Polígonos triangulados en abanico.
+    Sin color por vértice, se colorea según la posición dentro de la caja.
+    """
+    pos, col, faces = [], [], []
+    has_color = True
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.startswith("v "):
+                p = line.split()
+                pos.append((float(p[1]), float(p[2]), float(p[3])))
+                if len(p) >= 7:
+                    col.append((float(p[4]), float(p[5]), float(p[6])))
+                else:
+                    has_color = False
+            elif line.startswith("f "):
+                n = len(pos)
+                idx = []
+                for tok in line.split()[1:]:
+                    i = int(tok.split("/", 1)[0])
+                    idx.append(i - 1 if i > 0 else n + i)
+                for j in range(1, len(idx) - 1):
+                    faces.append((idx[0], idx[j], idx[j + 1]))
+
+    P = np.array(pos, dtype="f4").reshape(-1, 3)
+    if has_color and len(col) == len(pos):
+        C = np.array(col, dtype="f4").reshape(-1, 3)
+    else:
+        lo, hi = (P.min(axis=0), P.max(axis=0)) if len(P) else (np.zeros(3), np.ones(3))
+        C = ((P - lo) / np.maximum(hi - lo, 1e-6)).astype("f4")
+
+    vertices = np.ascontiguousarray(np.hstack([P, C]), dtype="f4")   # (N, 6) "3f 3f"
+    indices = np.array(faces, dtype="i4").reshape(-1)
+    return vertices, indices
@@ -1,6 +1,7 @@
+from src.startup import seconds_since_process_start, LazyModes  # primero: lo más liviano
+import sys
 from pathlib import Path
 import pyglet
-import glm
 
 from src.window import Window
 from src.shader_program import ShaderProgram
@@ -9,12 +10,15 @@ from src.camera import Camera
 from src.scene import Scene
 from src.cube import Cube
 
-from src.raytracing.core import RaytracingRenderer   # <--- nuevo
-
-def build_tp4_scene(win, shaders_dir: Path):
+def build_tp4_scene(win, shaders_dir: Path, scene_path=None):
     shader = ShaderProgram(win.ctx, shaders_dir / "basic.vert", shaders_dir / "basic.frag")
     cam = Camera(fov_deg=60.0, aspect=win.width / win.height, near=0.1, far=100.0)
-    scene = Scene(win.ctx, cam, shader)
+    scene = Scene(win.ctx, cam, shader, picker_factory=lambda: _build_picker(win, shaders_dir))
+
+    if scene_path is not None:
+        # escena desde archivo (.json / .obj) vía cache binario mmap
+        from src.loader import load_scene, add_to_scene
+        return add_to_scene(scene, win.ctx, shader, load_scene(scene_path))
 
     cube1 = Cube("CuboA")
     cube1.set_position(-1.2, 0.0, 0.0)
@@ -31,27 +35,61 @@ def build_tp4_scene(win, shaders_dir: Path):
     scene.add(cube2, g2)
     return scene
 
+def _build_picker(win, shaders_dir: Path):
+    # import diferido: el ID-buffer (y su shader) sólo si se activa el picking GPU con G
+    from src.picking import IdBufferPicker
+    return IdBufferPicker(win.ctx, shaders_dir)
+
+def build_raytracing(win, shaders_dir: Path):
+    # import diferido: el módulo de raytracing (y pyglet.shapes) sólo si se usa
+    from src.raytracing.core import RaytracingRenderer
+    return RaytracingRenderer(win, shaders_dir)
+
+def _arg_value(name: str):
+    """Valor de una opción '--nombre valor' en sys.argv (o None)."""
+    if name in sys.argv[:-1]:
+        return sys.argv[sys.argv.index(name) + 1]
+    return None
+
 def main():
     base = Path(__file__).resolve().parent.parent
     shaders_dir = base / "shaders"
 
-    win = Window(1280, 720, "TP 3 (T para alternar)")
-
-    # ---- Modo A: Escena TP4 (picking) ----
-    scene = build_tp4_scene(win, shaders_dir)
-
-    # ---- Modo B: Raytracing (quad + shader) ----
-    rt = RaytracingRenderer(win, shaders_dir)
+    # --warmup               : construir los modos restantes después del primer frame
+    # --exit-after-first-frame: medir el arranque y salir (instancias de corta vida)
+    warmup = "--warmup" in sys.argv
+    exit_after_first_frame = "--exit-after-first-frame" in sys.argv
+    # --scene <archivo>       : cargar la escena TP4 desde .json / .obj (cache .cgbin)
+    scene_path = _arg_value("--scene")
+    scene_path = Path(scene_path) if scene_path else None
+    # --record <trace>        : grabar teclas/mouse/dt de la sesión
+    # --replay <trace>        : reproducir sin ventana visible con dt fijo y salir
+    #   --dt <s> (1/60), --hash-frames, --replay-out <csv>
+    #   (sin display: PYGLET_HEADLESS=1 usa EGL)
+    record_path = _arg_value("--record")
+    replay_path = _arg_value("--replay")
+
+    size = (1280, 720)
+    if replay_path:
+        from src.trace import load_trace
+        size, _ = load_trace(replay_path)
+    win = Window(*size, "TP 3 (T para alternar)", visible=not replay_path)
+
+    # Los modos se construyen recién la primera vez que se activan
+    modes = LazyModes()
+    modes.register("tp4", lambda: build_tp4_scene(win, shaders_dir, scene_path))   # Modo A: Escena TP4 (picking)
+    modes.register("rt",  lambda: build_raytracing(win, shaders_dir))  # Modo B: Raytracing (quad + shader)
 
     # estado: arrancamos en modo TP4
     mode = {"rt": False}
 
     def use_tp4():
-        win.set_scene(scene)
+        win.set_scene(modes.get("tp4"))
         mode["rt"] = False
         print("[Modo]")
 
     def use_rt():
+        rt = modes.get("rt")
         win.set_scene(None)          # desconectamos la escena
         win.set_renderer(rt)         # (opcional) si usás set_renderer, sino llama rt.render() desde on_draw
         mode["rt"] = True
@@ -61,21 +99,43 @@ def main():
     print("""
 ================= CONTROLES =================
 T : Alternar
+G : Picking por CPU (hitbox) / GPU (ID-buffer) (escena TP4)
+V : Resaltar objeto bajo el mouse (escena TP4, picking GPU)
 H : Mostrar/ocultar HUD (solo en Raytracing)
 Espacio : Pausar/reanudar animación (Raytracing)
 W / S : Mover luz adelante / atrás
 A / D : Mover luz izquierda / derecha
 R / F : Mover luz arriba / abajo
 P : Mostrar posición de la luz en consola
+L / K : Agregar 16 luces de colores / quitar las extra (Raytracing)
+M : Material de la esfera: difuso / espejo / vidrio (Raytracing)
+B : Rebotes máximos 0..8 (Raytracing)
 =============================================
 """)
     # update loop
+    recorder = None
     def _update(dt):
+        if recorder is not None:
+            recorder.tick(dt)   # cierra el frame grabado con el dt real
         if mode["rt"]:
-            rt.update(dt)
+            modes.get("rt").update(dt)
         else:
-            scene.update(dt)
-    pyglet.clock.schedule_interval(_update, 1/60)
+            modes.get("tp4").update(dt)
+    if not replay_path:
+        pyglet.clock.schedule_interval(_update, 1/60)
+
+    def _warm_up(dt):
+        # un modo por tick, entre frames (el contexto GL es del hilo principal)
+        if not modes.warm_up():
+            pyglet.clock.unschedule(_warm_up)
+
+    def _on_first_frame():
+        print(f"[Startup] primer frame a {seconds_since_process_start() * 1000:.1f} ms del inicio del proceso")
+        if exit_after_first_frame:
+            pyglet.app.exit()
+        elif warmup:
+            pyglet.clock.schedule_interval(_warm_up, 0.1)
+    win.call_after_first_frame(_on_first_frame)
 
     # tecla T para alternar
     @win.event
@@ -87,6 +147,24 @@ P : Mostrar posición de la luz en consola
             else:
                 use_rt()
 
+    if replay_path:
+        from src.trace import TraceReplayer
+        replayer = TraceReplayer(win, _update, replay_path,
+                                 dt=float(_arg_value("--dt") or 1/60),
+                                 hash_frames="--hash-frames" in sys.argv)
+        replayer.run()
+        print(replayer.summary())
+        if _arg_value("--replay-out"):
+            replayer.write_report(_arg_value("--replay-out"))
+        win.close()
+        return
+
+    if record_path:
+        # después de @win.event: push_handlers abre un frame nuevo en la pila
+        from src.trace import InputRecorder
+        recorder = InputRecorder(record_path, win.width, win.height)
+        win.push_handlers(recorder)
+
     try:
         win.switch_to(); win.set_visible(True); win.activate()
     except Exception:
@@ -94,5 +172,8 @@ P : Mostrar posición de la luz en consola
 
     win.run()
 
+    if record_path:
+        recorder.save()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,46 @@
+# src/mesh.py
+import numpy as np
+import glm
+from src.hit import HitBoxOBB
+
+class Mesh:
+    """
+    Objeto genérico con geometría cargada de archivo (ver src/loader.py).
+    Misma interfaz que Cube: vertices "3f 3f" intercalados, indices int32,
+    matriz de modelo, selección y hitbox OBB ajustada a la caja local.
+    """
+    def __init__(self, name, vertices: np.ndarray, indices: np.ndarray, model=None):
+        self.name = name
+        self.vertices = vertices
+        self.indices = indices
+
+        self.model = glm.mat4(1.0) if model is None else glm.mat4(model)
+        self.selected = False
+
+        pos = np.asarray(vertices).reshape(-1, 6)[:, :3]
+        if len(pos):
+            bmin, bmax = pos.min(axis=0), pos.max(axis=0)
+        else:
+            bmin, bmax = np.zeros(3), np.zeros(3)
+        self.collision = HitBoxOBB(
+            get_model_matrix=self.get_model_matrix,
+            local_min=tuple(map(float, bmin)),
+            local_max=tuple(map(float, bmax)),
+        )
+
+    def get_model_matrix(self) -> glm.mat4:
+        return glm.mat4(self.model)
+
+    def set_position(self, x: float, y: float, z: float):
+        T = glm.translate(glm.mat4(1.0), glm.vec3(x, y, z))
+        self.model = T * self.model
+
+    def rotate_y(self, radians: float):
+        self.model = self.model * glm.rotate(glm.mat4(1.0), radians, glm.vec3(0.0, 1.0, 0.0))
+
+    def scale_uniform(self, s: float):
+        self.model = self.model * glm.scale(glm.mat4(1.0), glm.vec3(s))
+
+    def check_hit(self, ray_origin, ray_dir):
+        """Devuelve t (distancia) o None."""
+        return self.collision.check_hit(ray_origin, ray_dir)
@@ -0,0 +1,121 @@
+# src/picking.py
+from pathlib import Path
+import numpy as np
+import moderngl
+
+from src.shader_program import ShaderProgram
+from src.camera import CameraUniformBlock
+
+
+class IdBufferPicker:
+    """
+    Picking por GPU con un ID-buffer:
+      - se dibuja cada objeto con su ID (índice + 1, 0 = fondo) y z-buffer
+        en un framebuffer offscreen entero (R32UI + depth),
+      - se lee sólo una región chica alrededor del cursor,
+      - la lectura es asíncrona: va a un PBO en el frame del pedido y se
+        resuelve en el frame siguiente (poll), sin frenar el pipeline.
+    El costo no depende de la cantidad de objetos en CPU y es exacto al píxel
+    (usa la geometría real, no la hitbox).
+    """
+    def __init__(self, ctx: moderngl.Context, shaders_dir: Path, radius: int = 2):
+        self.ctx = ctx
+        self.shader = ShaderProgram(ctx, shaders_dir / "id.vert", shaders_dir / "id.frag")
+        CameraUniformBlock.shared(ctx).bind(self.shader)   # misma cámara que la pasada de color
+        self.radius = int(radius)
+        self.size = (0, 0)
+        self.fbo = None
+
+        # región (2r+1)^2 de uint32 → PBO para la lectura asíncrona
+        side = 2 * self.radius + 1
+        self._pbo = ctx.buffer(reserve=side * side * 4)
+        self._pending = None     # (px, py, tag) pedido, todavía sin dibujar
+        self._in_flight = None   # (w, h, cx, cy, tag) región ya encolada en el PBO
+
+    # ---- tamaño ----
+    def on_resize(self, w: int, h: int):
+        w, h = max(1, int(w)), max(1, int(h))
+        if (w, h) == self.size:
+            return
+        if self.fbo is not None:
+            self.fbo.release()
+            self._color.release()
+            self._depth.release()
+        self.size = (w, h)
+        self._color = self.ctx.texture((w, h), 1, dtype="u4")
+        self._depth = self.ctx.depth_renderbuffer((w, h))
+        self.fbo = self.ctx.framebuffer(color_attachments=[self._color], depth_attachment=self._depth)
+        self._in_flight = None
+
+    # ---- pedidos ----
+    def request(self, u: float, v: float, tag: str = "click"):
+        """
+        u,v ∈ [0,1] con v hacia abajo (igual que Scene.on_mouse_click).
+        tag distingue el uso (ej. "click" / "hover"); un click pisa un hover.
+        """
+        if self._pending is not None and self._pending[2] == "click" and tag != "click":
+            return
+        w, h = self.size
+        px = min(w - 1, max(0, int(u * w)))
+        py = min(h - 1, max(0, int((1.0 - v) * h)))  # framebuffer: y hacia arriba
+        self._pending = (px, py, tag)
+
+    @property
+    def has_request(self) -> bool:
+        return self._pending is not None
+
+    # ---- pasada de IDs ----
+    def render_ids(self, items, model_of):
+        """
+        Dibuja los IDs y encola la lectura de la región pedida en el PBO.
+        items: lista (obj, graphics) de la escena; model_of(obj) -> mat4.
+        La cámara sale del bloque uniform compartido (ya publicado en el frame).
+        """
+        if self._pending is None or self.fbo is None:
+            return
+
+        prev_fbo = self.ctx.fbo
+        prev_vp = self.ctx.viewport
+
+        self.fbo.use()
+        self.fbo.clear(0.0, 0.0, 0.0, 0.0, depth=1.0)
+        self.ctx.enable(moderngl.DEPTH_TEST)
+
+        for i, (obj, gfx) in enumerate(items):
+            self.shader.set_mat4("uModel", model_of(obj))
+            self.shader.program["uId"].value = i + 1
+            gfx.vao_for(self.shader).render(mode=moderngl.TRIANGLES)
+
+        # región recortada a los bordes del framebuffer
+        px, py, tag = self._pending
+        w, h = self.size
+        x0, y0 = max(0, px - self.radius), max(0, py - self.radius)
+        x1, y1 = min(w, px + self.radius + 1), min(h, py + self.radius + 1)
+        self.fbo.read_into(self._pbo, viewport=(x0, y0, x1 - x0, y1 - y0), components=1, dtype="u4")
+        self._in_flight = (x1 - x0, y1 - y0, px - x0, py - y0, tag)
+        self._pending = None
+
+        prev_fbo.use()
+        self.ctx.viewport = prev_vp
+
+    def poll(self):
+        """
+        Resuelve la lectura encolada en el frame anterior.
+        Devuelve None si no había nada pendiente, o (tag, índice) con
+        índice = -1 si se pegó al fondo, o la posición del objeto en items.
+        """
+        if self._in_flight is None:
+            return None
+        w, h, cx, cy, tag = self._in_flight
+        self._in_flight = None
+
+        ids = np.frombuffer(self._pbo.read(size=w * h * 4), dtype=np.uint32).reshape(h, w)
+        if ids[cy, cx] != 0:
+            return tag, int(ids[cy, cx]) - 1
+
+        # tolerancia: el píxel no vacío más cercano al centro de la región
+        ys, xs = np.nonzero(ids)
+        if len(xs) == 0:
+            return tag, -1
+        k = np.argmin((xs - cx) ** 2 + (ys - cy) ** 2)
+        return tag, int(ids[ys[k], xs[k]]) - 1
@@ -42,15 +42,38 @@ class RaycastingRenderer(RendererBase):
         self.move_speed = 3.0    # unidades/seg
         self.rot_speed  = 1.8    # rad/seg
 
-        # Framebuffer de imagen (RGB)
+        # Framebuffer de imagen (RGB) + profundidad perpendicular por columna
         self.fb = np.zeros((self.H, self.W, 3), dtype=np.uint8)
+        self.zbuf = np.full(self.W, 1e6, dtype=np.float32)
         self._img = None
 
+        # Sprites (billboards): arrays paralelos para operar vectorizado
+        self.sprite_xy    = np.zeros((0, 2), dtype=np.float32)
+        self.sprite_kind  = np.zeros(0, dtype=np.int32)
+        self.sprite_scale = np.zeros(0, dtype=np.float32)
+        self.sprite_tex   = self._make_sprite_textures()   # (K, T, T, 4) RGBA
+
+        self.add_sprite(5.5, 5.5, kind=0)   # item
+        self.add_sprite(8.5, 3.5, kind=1)   # enemigo
+        self.add_sprite(3.5, 7.5, kind=1)
+
+        # Piso / techo texturados: tile de textura por celda del mapa
+        self.textured_floor = True
+        self.floor_tex = self._make_floor_textures()       # (K, T, T, 3) RGB
+        yy, xx = np.indices(self.map.shape)
+        self.floor_map = ((xx + yy) % 2).astype(np.int32)  # damero de baldosas 0/1
+        self.ceil_map  = np.full(self.map.shape, 2, dtype=np.int32)
+        self.ceil_map[self.map == 3] = 3                   # (celdas “verdes”: otro panel)
+        self.ceil_map[9:, 1:5] = 3
+        self._floor_tables = None                          # tablas por fila/columna cacheadas
+
     # ---------- API RendererBase ----------
     def on_resize(self, w: int, h: int):
         self.W, self.H = int(w), int(h)
         self.fb = np.zeros((self.H, self.W, 3), dtype=np.uint8)
+        self.zbuf = np.full(self.W, 1e6, dtype=np.float32)
         self._img = None
+        self._floor_tables = None
 
     def update(self, dt: float):
         # Movimiento básico
@@ -78,9 +101,12 @@ class RaycastingRenderer(RendererBase):
             self.cam_a += self.rot_speed * dt
 
     def render(self):
-        # Cielo / piso
-        self.fb[: self.H//2, :, :] = (22, 24, 31)      # “cielo”
-        self.fb[self.H//2 :, :, :] = (32, 34, 42)      # “piso”
+        # Cielo / piso (texturados o color plano); las paredes se dibujan encima
+        if self.textured_floor:
+            self._cast_floor_ceiling()
+        else:
+            self.fb[: self.H//2, :, :] = (22, 24, 31)      # “cielo”
+            self.fb[self.H//2 :, :, :] = (32, 34, 42)      # “piso”
 
         # Raycasting por columnas
         for x in range(self.W):
@@ -91,6 +117,7 @@ class RaycastingRenderer(RendererBase):
 
             # Altura de columna con corrección por “fisheye”
             dist = max(1e-4, dist * cos(cam_ray))
+            self.zbuf[x] = dist
             col_h = int(self.H / dist)
 
             # Color por tipo de pared + atenuación con distancia
@@ -108,6 +135,9 @@ class RaycastingRenderer(RendererBase):
             if y1 > y0:
                 self.fb[y0:y1, x, :] = color
 
+        # Sprites recortados contra el z-buffer de columnas
+        self._draw_sprites()
+
         # Blit a la ventana (creamos o actualizamos ImageData)
         # OJO: pyglet usa formato 'RGB' y la imagen se crea desde un buffer alto->bajo
         data = self.fb[::-1].tobytes()  # flip vertical
@@ -118,6 +148,187 @@ class RaycastingRenderer(RendererBase):
 
         self._img.blit(0, 0)
 
+    # ---------- Piso / techo ----------
+    @staticmethod
+    def _make_floor_textures(size: int = 32):
+        """Texturas procedurales: 0/1 baldosas, 2 madera (techo), 3 panel (techo)."""
+        t = np.arange(size)
+        u, v = np.meshgrid(t, t)
+        tex = np.zeros((4, size, size, 3), dtype=np.uint8)
+
+        grout = (u < 1) | (v < 1)
+        noise = ((u * 7 + v * 13) % 5).astype(np.int16) * 3
+        tex[0] = np.clip(np.int16(110) + noise, 0, 255)[..., None]
+        tex[1] = np.clip(np.int16(80) + noise, 0, 255)[..., None]
+        tex[0][grout] = tex[1][grout] = (40, 40, 44)
+
+        grain = (np.sin(v * 0.9 + np.sin(u * 0.3) * 2.0) * 12).astype(np.int16)
+        tex[2] = np.stack([np.clip(95 + grain, 0, 255), np.clip(70 + grain, 0, 255),
+                           np.clip(45 + grain // 2, 0, 255)], axis=-1)
+        border = (u < 2) | (v < 2) | (u >= size - 2) | (v >= size - 2)
+        tex[3] = (60, 90, 70)
+        tex[3][border] = (35, 50, 40)
+        return tex
+
+    def _floor_row_tables(self):
+        """
+        Tablas que sólo cambian con el tamaño o el fov (se reusan entre frames):
+          row_dist : distancia perpendicular del piso en cada fila bajo el horizonte
+          row_shade: atenuación (0..256) por fila, misma curva que las paredes
+          col_ang  : ángulo de cada columna relativo a la cámara
+          inv_cos  : 1/cos(col_ang) (deshace la corrección de fisheye)
+        """
+        key_ = (self.W, self.H, self.fov)
+        if self._floor_tables is None or self._floor_tables[0] != key_:
+            h2 = self.H // 2
+            p = np.arange(self.H - h2, dtype=np.float32) + 0.5       # píxeles bajo el horizonte
+            row_dist = (self.H / (2.0 * p)).astype(np.float32)
+            row_shade = (256.0 / (1.0 + 0.1 * row_dist * row_dist)).astype(np.uint16)
+            col_ang = ((np.arange(self.W, dtype=np.float32) / max(1, self.W - 1) - 0.5) * self.fov).astype(np.float32)
+            inv_cos = (1.0 / np.cos(col_ang)).astype(np.float32)
+            self._floor_tables = (key_, row_dist, row_shade, col_ang, inv_cos)
+        return self._floor_tables[1:]
+
+    def _cast_floor_ceiling(self):
+        """
+        Floor casting vectorizado: coordenadas de mundo del piso para todas las
+        filas × columnas por broadcasting, gather de texels según la celda del
+        mapa (floor_map / ceil_map) y el techo como espejo de las mismas filas.
+        """
+        row_dist, row_shade, col_ang, inv_cos = self._floor_row_tables()
+        h2 = self.H // 2
+        tex = self.floor_tex
+        T = tex.shape[1]
+
+        # dirección por columna escalada para que row_dist (perpendicular) dé el punto
+        ang = self.cam_a + col_ang
+        dir_x = (np.cos(ang) * inv_cos).astype(np.float32)
+        dir_y = (np.sin(ang) * inv_cos).astype(np.float32)
+        wx = self.cam_x + row_dist[:, None] * dir_x[None, :]      # (filas, W)
+        wy = self.cam_y + row_dist[:, None] * dir_y[None, :]
+
+        cx = np.floor(wx)
+        cy = np.floor(wy)
+        tu = ((wx - cx) * T).astype(np.int32) % T
+        tv = ((wy - cy) * T).astype(np.int32) % T
+        cxi = np.clip(cx, 0, self.map_w - 1).astype(np.int32)
+        cyi = np.clip(cy, 0, self.map_h - 1).astype(np.int32)
+
+        shade = row_shade[:, None, None]
+        floor = tex[self.floor_map[cyi, cxi], tv, tu]             # (filas, W, 3)
+        self.fb[h2:] = (floor * shade >> 8).astype(np.uint8)
+
+        # techo: la fila h2-1-i ve el mismo punto (x, y) que la fila de piso i
+        n = h2
+        ceil = tex[self.ceil_map[cyi[:n], cxi[:n]], tv[:n], tu[:n]]
+        self.fb[:h2] = (ceil * shade[:n] >> 8).astype(np.uint8)[::-1]
+
+    # ---------- Sprites ----------
+    def add_sprite(self, x: float, y: float, kind: int = 0, scale: float = 0.6):
+        """Agrega un sprite en (x, y) de celda; kind indexa sprite_tex."""
+        self.sprite_xy    = np.vstack([self.sprite_xy, np.array([[x, y]], dtype=np.float32)])
+        self.sprite_kind  = np.append(self.sprite_kind, np.int32(kind))
+        self.sprite_scale = np.append(self.sprite_scale, np.float32(scale))
+
+    def clear_sprites(self):
+        self.sprite_xy    = np.zeros((0, 2), dtype=np.float32)
+        self.sprite_kind  = np.zeros(0, dtype=np.int32)
+        self.sprite_scale = np.zeros(0, dtype=np.float32)
+
+    @staticmethod
+    def _make_sprite_textures(size: int = 32):
+        """Texturas procedurales: 0 = item (rombo amarillo), 1 = enemigo (círculo rojo)."""
+        c = (np.arange(size) + 0.5) / size * 2.0 - 1.0
+        u, v = np.meshgrid(c, c)                      # v: fila (arriba → abajo)
+        tex = np.zeros((2, size, size, 4), dtype=np.uint8)
+
+        diamond = (np.abs(u) + np.abs(v)) < 0.9
+        tex[0][diamond] = (230, 200, 60, 255)
+
+        r2 = u * u + v * v
+        tex[1][r2 < 0.8] = (200, 60, 60, 255)
+        eyes = ((u - 0.3) ** 2 + (v + 0.25) ** 2 < 0.02) | ((u + 0.3) ** 2 + (v + 0.25) ** 2 < 0.02)
+        tex[1][eyes] = (250, 250, 250, 255)
+        return tex
+
+    def _draw_sprites(self):
+        """
+        Billboards ordenados por distancia y recortados contra self.zbuf.
+        Todo vectorizado: se expanden pares (sprite, columna) y luego
+        (sprite, columna, fila); sin bucles en Python por sprite ni por píxel.
+        """
+        if len(self.sprite_xy) == 0:
+            return
+        W, H = self.W, self.H
+        tex = self.sprite_tex
+        T = tex.shape[1]
+
+        # --- espacio de cámara (proyección lineal en ángulo, igual que las paredes)
+        rel = self.sprite_xy - np.array([self.cam_x, self.cam_y], dtype=np.float32)
+        dist = np.hypot(rel[:, 0], rel[:, 1])
+        ang = np.arctan2(rel[:, 1], rel[:, 0]) - self.cam_a
+        ang = (ang + pi) % (2 * pi) - pi
+        perp = dist * np.cos(ang)
+
+        px_per_rad = (W - 1) / self.fov
+        sx = (ang / self.fov + 0.5) * (W - 1)                         # centro en pantalla
+        w_px = self.sprite_scale / np.maximum(dist, 1e-4) * px_per_rad
+        h_px = self.sprite_scale * H / np.maximum(perp, 1e-4)
+
+        vis = (perp > 0.05) & (sx + w_px / 2 >= 0) & (sx - w_px / 2 < W)
+        if not vis.any():
+            return
+        idx = np.nonzero(vis)[0]
+        idx = idx[np.argsort(-perp[idx])]                             # lejos → cerca
+
+        # datos por sprite visible (ya ordenados)
+        pv, sxv, wv, hv = perp[idx], sx[idx], w_px[idx], h_px[idx]
+        x_start = sxv - wv / 2
+        x0 = np.clip(np.floor(x_start), 0, W).astype(np.int32)
+        x1 = np.clip(np.ceil(sxv + wv / 2), 0, W).astype(np.int32)
+        floor_y = H / 2 + (H / np.maximum(pv, 1e-4)) / 2              # apoyados en el piso
+        y_start = floor_y - hv
+        y0 = np.clip(np.floor(y_start), 0, H).astype(np.int32)
+        y1 = np.clip(np.ceil(floor_y), 0, H).astype(np.int32)
+        tex_base = self.sprite_kind[idx].astype(np.int32) * (T * T)   # offset en la textura aplanada
+        shade = 1.0 / (1.0 + 0.1 * pv * pv)
+
+        # --- pares (sprite, columna) + recorte contra el z-buffer
+        ncol = np.maximum(x1 - x0, 0)
+        s_of = np.repeat(np.arange(len(idx), dtype=np.int32), ncol)
+        col = x0[s_of] + (np.arange(len(s_of), dtype=np.int32) - np.repeat(np.cumsum(ncol) - ncol, ncol))
+        keep = pv[s_of] < self.zbuf[col]
+        s_of, col = s_of[keep], col[keep]
+        if len(s_of) == 0:
+            return
+        tu = ((col + 0.5 - x_start[s_of]) / wv[s_of] * T).astype(np.int32).clip(0, T - 1)
+        pair_tex = tex_base[s_of] + tu
+
+        # --- (sprite, columna, fila): índice de texel en la textura aplanada
+        nrow = np.maximum(y1[s_of] - y0[s_of], 0)
+        p_of = np.repeat(np.arange(len(s_of), dtype=np.int32), nrow)
+        row = np.repeat(y0[s_of], nrow) + (np.arange(len(p_of), dtype=np.int32) - np.repeat(np.cumsum(nrow) - nrow, nrow))
+        sp = s_of[p_of]
+        tv = ((row + 0.5 - y_start[sp]) / hv[sp] * T).astype(np.int32).clip(0, T - 1)
+        tix = pair_tex[p_of] + tv * T
+
+        # alfa primero (gather de 1 byte); RGB sólo para los píxeles que ganan
+        tex_flat = tex.reshape(-1, 4)
+        opaque = tex_flat[tix, 3] > 0
+        sp, row, tix = sp[opaque], row[opaque], tix[opaque]
+        pcol = col[p_of[opaque]]
+        if len(sp) == 0:
+            return
+
+        # el más cercano gana por píxel (sp crece de lejos a cerca → máximo sp)
+        flat = row * W + pcol
+        owner = np.full(H * W, -1, dtype=np.int32)
+        np.maximum.at(owner, flat, sp)
+        win = owner[flat] == sp
+
+        rgb = np.clip(tex_flat[tix[win], :3] * shade[sp[win], None], 0, 255).astype(np.uint8)
+        self.fb[row[win], pcol[win]] = rgb
+
     # ---------- Eventos de teclado ----------
     def on_key_press(self, symbol, modifiers):
         self.keys.add(symbol)
@@ -3,14 +3,20 @@ import numpy as np
 import moderngl
 import glm
 import pyglet
-import pyglet.shapes  # <- necesario para el rectángulo del HUD
 from pyglet.window import key
 
+from src.camera import Camera, CameraUniformBlock
+from src.raytracing.lights import LightGrid, MAX_LIGHTS
+
 
 class RaytracingRenderer:
     """
     Quad a pantalla; el fragment shader hace el raytracing
-    (esfera + plano, Lambert/Phong, sombra dura).
+    (esfera + plano, Lambert/Phong, sombra dura por luz).
+    Reflexión/refracción con un loop de rebotes iterativo: profundidad máxima,
+    corte por throughput y un presupuesto global de rayos por frame.
+    Muchas luces puntuales (color + alcance) en un uniform block, con culling
+    por tiles de pantalla en CPU: cada píxel sólo evalúa las luces de su tile.
     Controles:
       T          : alternar (lo maneja main/window)
       ESPACIO    : pausar/seguir animación orbital de la luz
@@ -18,6 +24,9 @@ class RaytracingRenderer:
       R/F        : mover luz en Y
       H          : mostrar/ocultar ayuda (HUD)
       P          : imprimir posición de la luz (debug)
+      L / K      : agregar 16 luces de colores / quitar las extra
+      M          : material de la esfera (difuso / espejo / vidrio)
+      B          : rebotes máximos (0..8)
     """
     def __init__(self, win, shaders_dir: Path):
         self.win = win
@@ -46,17 +55,47 @@ class RaytracingRenderer:
         self.prog["uSphereRadius"].value = 0.75
         self.prog["uPlaneY"].value = -1.0
 
-        # cámara
-        self.set_aspect(self.W / max(1, self.H))
-        self.set_fov(glm.radians(60.0))
-        eye    = glm.vec3(3.0, 2.5, 3.0)
-        target = glm.vec3(0.0, 0.5, 0.0)
-        up     = glm.vec3(0.0, 1.0, 0.0)
-        self.view = glm.lookAt(eye, target, up)
+        # cámara: matrices cacheadas + bloque uniform compartido con los otros programas
+        self.camera = Camera(fov_deg=60.0, aspect=self.W / max(1, self.H), near=0.1, far=100.0)
+        self.camera.eye    = glm.vec3(3.0, 2.5, 3.0)
+        self.camera.target = glm.vec3(0.0, 0.5, 0.0)
+        self.camera.up     = glm.vec3(0.0, 1.0, 0.0)
+        self.camera_block = CameraUniformBlock.shared(self.ctx)
+        self.camera_block.bind(self.prog)
 
-        # luz (inicial)
+        # luz principal (animada) + luces extra: (pos, color, alcance)
         self.light_pos = glm.vec3(4.0, 2.5, 0.0)
-        self.prog["uLightPos"].value = tuple(self.light_pos)
+        self.light_color = (1.0, 1.0, 1.0)
+        self.light_range = 30.0
+        self.extra_lights = []
+        self.light_grid = LightGrid(self.ctx, self.prog, tile=32)
+        self._rng = np.random.default_rng(7)
+
+        # materiales de la esfera: (nombre, reflect, transmit, ior)
+        self.sphere_materials = [
+            ("difuso", 0.0,  0.0, 1.5),
+            ("espejo", 0.8,  0.0, 1.5),
+            ("vidrio", 0.05, 0.9, 1.5),
+        ]
+        self.material_idx = 1
+        self.prog["uPlaneReflect"].value = 0.2
+        self._apply_material()
+
+        # rebotes: tope por píxel y presupuesto global (rayos de camino por frame)
+        self.max_depth = 4
+        self.min_throughput = 0.02
+        self.ray_budget = None          # None = sin límite (sólo max_depth)
+        self.prog["uMinThroughput"].value = self.min_throughput
+
+        # estadísticas: cada stats_interval frames, pasada chica que escribe rebotes;
+        # la lectura va a un PBO y se resuelve en el frame siguiente (sin stall)
+        self.stats_interval = 30
+        self.avg_bounces = 0.0
+        self._frame = 0
+        self._stats_tex = None
+        self._stats_fbo = None
+        self._stats_pbo = None
+        self._stats_in_flight = False
 
         # animación / input
         self.time = 0.0
@@ -66,10 +105,18 @@ class RaytracingRenderer:
         self.orbit_radius = 4.0    # órbita más grande
 
         # ---------- HUD ----------
+        # se crea en el primer render que lo muestra (carga de fuentes incluida)
         self.show_hud = True
+        self._batch = None
+
+    # ---------------- HUD ----------------
+    def _ensure_hud(self):
+        if self._batch is not None:
+            return
+        from pyglet import shapes  # <- necesario para el rectángulo del HUD (import diferido)
         self._batch = pyglet.graphics.Batch()
-        self._hud_bg = pyglet.shapes.Rectangle(
-            x=8, y=self.H - 8 - 110, width=460, height=110,
+        self._hud_bg = shapes.Rectangle(
+            x=8, y=self.H - 8 - 158, width=460, height=158,
             color=(0, 0, 0), batch=self._batch
         )
         self._hud_bg.opacity = 140
@@ -82,7 +129,6 @@ class RaytracingRenderer:
             batch=self._batch,
         )
 
-    # ---------------- HUD text ----------------
     def _hud_text(self):
         return (
             "Controles (Raytracing):\n"
@@ -92,24 +138,51 @@ class RaytracingRenderer:
             "  R/F      : mover luz en Y\n"
             "  H        : mostrar/ocultar esta ayuda\n"
             "  P        : imprimir posición de la luz (consola)\n"
+            "  L / K    : agregar 16 luces / quitar luces extra\n"
+            "  M / B    : material esfera / rebotes máx\n"
+            f"  {self.sphere_materials[self.material_idx][0]}, rebotes: máx {self.max_depth},"
+            f" promedio {self.avg_bounces:.2f}/píxel\n"
         )
 
+    def _refresh_hud(self):
+        if self._batch is not None:
+            self._hud_label.text = self._hud_text()
+
     # --------------- API pública ---------------
+    @property
+    def aspect(self) -> float:
+        return self.camera.aspect
+
+    @property
+    def fov(self) -> float:
+        """fov vertical en radianes."""
+        return glm.radians(self.camera.fov_deg)
+
+    @property
+    def view(self) -> glm.mat4:
+        return self.camera.view
+
     def set_aspect(self, aspect: float):
-        self.aspect = max(1e-5, float(aspect))
-        self.prog["uAspect"].value = self.aspect
+        self.camera.set_aspect(aspect)
 
     def set_fov(self, fov_rad: float):
-        self.fov = float(fov_rad)
-        self.prog["uFov"].value = self.fov
+        self.camera.fov_deg = glm.degrees(float(fov_rad))
 
     def on_resize(self, w: int, h: int):
         self.W, self.H = int(w), int(h)
         self.ctx.viewport = (0, 0, self.W, self.H)
         self.set_aspect(self.W / max(1, self.H))
-        # mover HUD
-        self._hud_bg.y = self.H - 8 - 110
-        self._hud_label.y = self.H - 16
+        if self._stats_fbo is not None:
+            # el framebuffer no libera sus attachments: soltar la textura también
+            self._stats_fbo.release()
+            self._stats_tex.release()
+            self._stats_pbo.release()
+            self._stats_fbo = self._stats_tex = self._stats_pbo = None
+            self._stats_in_flight = False
+        # mover HUD (si ya existe)
+        if self._batch is not None:
+            self._hud_bg.y = self.H - 8 - 158
+            self._hud_label.y = self.H - 16
 
     def update(self, dt: float):
         # órbita visible y oscilación vertical
@@ -137,19 +210,98 @@ class RaytracingRenderer:
 
     def render(self):
         self.ctx.clear(0.08, 0.09, 0.12, 1.0)
+        # la escena TP4 deja el depth test prendido: el quad escribiría z=0.5
+        # y el HUD (también en z=0.5) no pasaría el test
+        self.ctx.disable(moderngl.DEPTH_TEST)
+
+        # uniforms (la cámara sólo se re-sube si cambió)
+        self.camera_block.publish(self.camera)
+        self._upload_lights()
+        self.prog["uResolution"].value = (float(self.W), float(self.H))
+        self.prog["uMaxDepth"].value = self.max_depth
+        self.prog["uBounceBudget"].value = self.bounce_budget()
 
-        # uniforms
-        invV = glm.inverse(self.view)
-        self.prog["uInvView"].write(np.array(invV.to_list(), dtype="f4").tobytes())
-        self.prog["uLightPos"].value = tuple(self.light_pos)
+        # la medición usa los uniforms recién subidos: llamarla siempre después
+        self._frame += 1
+        if self._stats_in_flight:
+            self._resolve_bounces()
+        elif self._frame % self.stats_interval == 0:
+            self._measure_bounces()
 
         self.vao.render()
 
         # HUD encima
         if self.show_hud:
+            self._ensure_hud()
             self.ctx.finish()
             self._batch.draw()
 
+    # --------------- rebotes ---------------
+    def set_ray_budget(self, rays_per_frame):
+        """Presupuesto global de rayos de camino (primario + rebotes) por frame; None = sin límite."""
+        self.ray_budget = None if rays_per_frame is None else max(0, int(rays_per_frame))
+
+    def bounce_budget(self) -> float:
+        """Rebotes por píxel que permite el presupuesto (el shader reparte la parte fraccional)."""
+        if self.ray_budget is None:
+            return float(self.max_depth)
+        per_pixel = self.ray_budget / max(1, self.W * self.H) - 1.0   # el primario siempre va
+        return float(min(self.max_depth, max(0.0, per_pixel)))
+
+    def _apply_material(self):
+        _, refl, transm, ior = self.sphere_materials[self.material_idx]
+        self.prog["uSphereReflect"].value = refl
+        self.prog["uSphereTransmit"].value = transm
+        self.prog["uSphereIOR"].value = ior
+
+    def _measure_bounces(self):
+        """
+        Rebotes por píxel sobre una grilla 1/8 de la pantalla, con los uniforms
+        del frame actual. La lectura se encola en un PBO (_resolve_bounces).
+        """
+        size = (max(1, self.W // 8), max(1, self.H // 8))
+        if self._stats_fbo is None:
+            self._stats_tex = self.ctx.texture(size, 1, dtype="f4")
+            self._stats_fbo = self.ctx.framebuffer(color_attachments=[self._stats_tex])
+            self._stats_pbo = self.ctx.buffer(reserve=size[0] * size[1] * 4)
+
+        prev_fbo = self.ctx.fbo
+        prev_vp = self.ctx.viewport
+        self._stats_fbo.use()
+        self.prog["uOutputBounces"].value = True
+        self.vao.render()
+        self.prog["uOutputBounces"].value = False
+        self._stats_fbo.read_into(self._stats_pbo, components=1, dtype="f4")
+        self._stats_in_flight = True
+        prev_fbo.use()
+        self.ctx.viewport = prev_vp
+
+    def _resolve_bounces(self):
+        """Lee el PBO encolado en un frame anterior y actualiza el promedio."""
+        self._stats_in_flight = False
+        data = np.frombuffer(self._stats_pbo.read(), dtype=np.float32)
+        self.avg_bounces = float(data.mean())
+        self._refresh_hud()
+
+    # --------------- luces ---------------
+    def add_light(self, pos, color=(1.0, 1.0, 1.0), light_range: float = 3.0):
+        if 1 + len(self.extra_lights) >= MAX_LIGHTS:
+            return False
+        self.extra_lights.append((tuple(pos), tuple(color), float(light_range)))
+        return True
+
+    def add_random_lights(self, n: int = 16):
+        for _ in range(n):
+            pos = (self._rng.uniform(-6, 6), self._rng.uniform(-0.8, 1.5), self._rng.uniform(-6, 6))
+            color = self._rng.uniform(0.2, 1.0, 3) * 1.5
+            if not self.add_light(pos, color, self._rng.uniform(1.0, 3.0)):
+                break
+
+    def _upload_lights(self):
+        lights = [(tuple(self.light_pos), self.light_color, self.light_range)] + self.extra_lights
+        pos, col, rng = zip(*lights)
+        self.light_grid.upload(pos, col, rng, self.view, self.fov, self.aspect, self.W, self.H)
+
     # --------------- eventos teclado ---------------
     def on_key_press(self, symbol, modifiers):
         self._keys.add(symbol)
@@ -159,6 +311,21 @@ class RaytracingRenderer:
             self.show_hud = not self.show_hud
         elif symbol == key.P:
             print(f"Light = ({self.light_pos.x:.2f}, {self.light_pos.y:.2f}, {self.light_pos.z:.2f})")
+        elif symbol == key.L:
+            self.add_random_lights(16)
+            n, per_tile = self.light_grid.last_stats
+            print(f"[Luces] {1 + len(self.extra_lights)} (último frame: {n} subidas, {per_tile:.1f} por tile)")
+        elif symbol == key.K:
+            self.extra_lights.clear()
+        elif symbol == key.M:
+            self.material_idx = (self.material_idx + 1) % len(self.sphere_materials)
+            self._apply_material()
+            self._refresh_hud()
+            print(f"[Material] esfera: {self.sphere_materials[self.material_idx][0]}")
+        elif symbol == key.B:
+            self.max_depth = (self.max_depth + 1) % 9
+            self._refresh_hud()
+            print(f"[Rebotes] máx = {self.max_depth}  (promedio medido: {self.avg_bounces:.2f}/píxel)")
 
     def on_key_release(self, symbol, modifiers):
         self._keys.discard(symbol)
\ No newline at end of file
@@ -0,0 +1,151 @@
+# src/raytracing/lights.py
+import numpy as np
+import moderngl
+
+MAX_LIGHTS = 256     # debe coincidir con MAX_LIGHTS en raytrace.frag
+INDEX_WIDTH = 1024   # ancho de la textura con las listas de luces por tile
+
+
+def cull_lights(pos_view: np.ndarray, ranges: np.ndarray, fov: float, aspect: float,
+                width: int, height: int, tile: int = 32, near: float = 1e-3):
+    """
+    Culling de luces por tiles de pantalla (en CPU, vectorizado).
+    pos_view: (N,3) posiciones en espacio de cámara (mira a -Z); ranges: (N,).
+    Cada luz es una esfera de radio = range; se proyecta su caja envolvente
+    (conservadora) y se anota en todos los tiles que toca.
+    Devuelve:
+      header : (TY, TX, 2) int32 → (offset, cantidad) en index por tile
+      index  : (M,) int32 con los índices de luz, agrupados por tile
+    """
+    tx_n = (width + tile - 1) // tile
+    ty_n = (height + tile - 1) // tile
+    n = len(ranges)
+    header = np.zeros((ty_n, tx_n, 2), dtype=np.int32)
+    if n == 0:
+        return header, np.zeros(0, dtype=np.int32)
+
+    x, y = pos_view[:, 0], pos_view[:, 1]
+    depth = -pos_view[:, 2]
+    r = ranges
+    half_tan = np.tan(fov * 0.5)
+
+    # profundidades cercana/lejana de la caja; si la cercana cruza el plano near,
+    # la luz puede tocar cualquier píxel → pantalla completa
+    z_near = depth - r
+    z_far = depth + r
+    full = z_near <= near
+    z_near = np.maximum(z_near, near)
+
+    def ndc_range(c, scale):
+        lo = np.minimum((c - r) / z_near, (c - r) / z_far) / scale
+        hi = np.maximum((c + r) / z_near, (c + r) / z_far) / scale
+        return lo, hi
+
+    x_lo, x_hi = ndc_range(x, half_tan * aspect)
+    y_lo, y_hi = ndc_range(y, half_tan)
+    x_lo[full], y_lo[full] = -1.0, -1.0
+    x_hi[full], y_hi[full] = 1.0, 1.0
+
+    # detrás de la cámara por completo o fuera de pantalla → descartada
+    alive = (z_far > near) & (x_hi >= -1.0) & (x_lo <= 1.0) & (y_hi >= -1.0) & (y_lo <= 1.0)
+
+    # NDC → tiles (gl_FragCoord: y hacia arriba, igual que NDC)
+    def to_tiles(lo, hi, size, count):
+        t0 = np.floor((lo * 0.5 + 0.5) * size / tile).astype(np.int64)
+        t1 = np.floor((hi * 0.5 + 0.5) * size / tile).astype(np.int64)
+        return np.clip(t0, 0, count - 1), np.clip(t1, 0, count - 1)
+
+    tx0, tx1 = to_tiles(x_lo, x_hi, width, tx_n)
+    ty0, ty1 = to_tiles(y_lo, y_hi, height, ty_n)
+
+    ids = np.nonzero(alive)[0]
+    if len(ids) == 0:
+        return header, np.zeros(0, dtype=np.int32)
+    nx = tx1[ids] - tx0[ids] + 1
+    ny = ty1[ids] - ty0[ids] + 1
+    cnt = nx * ny
+
+    # expandir (luz, tile) sin bucles por luz
+    l_of = np.repeat(np.arange(len(ids)), cnt)
+    k = np.arange(len(l_of)) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+    tx = tx0[ids][l_of] + k % nx[l_of]
+    ty = ty0[ids][l_of] + k // nx[l_of]
+    tile_id = ty * tx_n + tx
+
+    order = np.argsort(tile_id, kind="stable")   # estable: conserva el orden de luces
+    index = ids[l_of[order]].astype(np.int32)
+    counts = np.bincount(tile_id, minlength=tx_n * ty_n)
+    offsets = np.cumsum(counts) - counts
+    header[..., 0] = offsets.reshape(ty_n, tx_n)
+    header[..., 1] = counts.reshape(ty_n, tx_n)
+    return header, index
+
+
+class LightGrid:
+    """
+    Sube luces + grilla de tiles al programa de raytracing:
+      - bloque uniform "Lights" (std140): vec4 pos/range y vec4 color por luz
+      - uTileHeader (isampler2D, RG32I): (offset, cantidad) por tile
+      - uTileIndex  (isampler2D, R32I) : índices de luz, INDEX_WIDTH por fila
+    """
+    def __init__(self, ctx: moderngl.Context, prog, tile: int = 32,
+                 binding: int = 1, header_unit: int = 1, index_unit: int = 2):
+        self.ctx = ctx
+        self.prog = prog
+        self.tile = int(tile)
+        self.header_unit = header_unit
+        self.index_unit = index_unit
+
+        self.ubo = ctx.buffer(reserve=MAX_LIGHTS * 32)
+        self.ubo.bind_to_uniform_block(binding)
+        prog["Lights"].binding = binding
+        prog["uTileSize"].value = self.tile
+        prog["uTileHeader"].value = header_unit
+        prog["uTileIndex"].value = index_unit
+
+        self._header_tex = None
+        self._index_tex = None
+        self.last_stats = (0, 0.0)  # (luces, promedio de luces por tile)
+
+    def _texture(self, tex, size, components):
+        if tex is not None and tex.size == size:
+            return tex
+        if tex is not None:
+            tex.release()
+        tex = self.ctx.texture(size, components, dtype="i4")
+        tex.filter = (moderngl.NEAREST, moderngl.NEAREST)
+        return tex
+
+    def upload(self, positions, colors, ranges, view, fov, aspect, width, height):
+        """positions/colors: (N,3) en mundo; ranges: (N,); view: glm.mat4."""
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)[:MAX_LIGHTS]
+        colors = np.asarray(colors, dtype=np.float32).reshape(-1, 3)[:MAX_LIGHTS]
+        ranges = np.asarray(ranges, dtype=np.float32).reshape(-1)[:MAX_LIGHTS]
+        n = len(ranges)
+
+        # UBO std140: arrays de vec4 → stride 16
+        block = np.zeros((2, MAX_LIGHTS, 4), dtype=np.float32)
+        block[0, :n, :3] = positions
+        block[0, :n, 3] = ranges
+        block[1, :n, :3] = colors
+        self.ubo.write(block.tobytes())
+        self.prog["uLightCount"].value = n
+
+        # a espacio de cámara (glm es column-major → transponer)
+        V = np.array(view.to_list(), dtype=np.float32).T
+        pos_view = positions @ V[:3, :3].T + V[:3, 3]
+        header, index = cull_lights(pos_view, ranges, fov, aspect, width, height, self.tile)
+
+        ty_n, tx_n = header.shape[:2]
+        self._header_tex = self._texture(self._header_tex, (tx_n, ty_n), 2)
+        self._header_tex.write(header.tobytes())
+
+        rows = max(1, (len(index) + INDEX_WIDTH - 1) // INDEX_WIDTH)
+        padded = np.zeros(rows * INDEX_WIDTH, dtype=np.int32)
+        padded[:len(index)] = index
+        self._index_tex = self._texture(self._index_tex, (INDEX_WIDTH, rows), 1)
+        self._index_tex.write(padded.tobytes())
+
+        self._header_tex.use(location=self.header_unit)
+        self._index_tex.use(location=self.index_unit)
+        self.last_stats = (n, len(index) / max(1, tx_n * ty_n))
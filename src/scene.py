@@ -2,14 +2,29 @@
 import moderngl
 import glm
 from src.ray import Ray
+from src.camera import CameraUniformBlock
 
 class Scene:
-    def __init__(self, ctx: moderngl.Context, camera, shader_program):
+    def __init__(self, ctx: moderngl.Context, camera, shader_program, picker_factory=None):
         self.ctx = ctx
         self.camera = camera
         self.shader = shader_program
         self.items = []      # lista de tuplas: (obj, graphics)
 
+        # matrices de cámara en un uniform buffer compartido (una subida por frame)
+        self.camera_block = CameraUniformBlock.shared(ctx)
+        self.camera_block.bind(shader_program)
+
+        # Picking: "cpu" (rayo vs HitBoxOBB) o "gpu" (ID-buffer, ver src/picking.py);
+        # el picker GPU se construye recién la primera vez que se activa con G
+        self.picker = None
+        self._picker_factory = picker_factory
+        self._size = None
+        self.pick_mode = "cpu"
+        self.hover_enabled = False
+        self.hovered = None
+        self._mouse_uv = None
+
     def add(self, obj, graphics):
         self.items.append((obj, graphics))
 
@@ -25,29 +40,49 @@ class Scene:
         self.ctx.clear(0.08, 0.09, 0.12, 1.0)
         self.ctx.enable(moderngl.DEPTH_TEST)
 
-        V = self.camera.view
-        P = self.camera.projection
+        # resultado del picking por GPU pedido en el frame anterior
+        if self.picker is not None:
+            self._resolve_gpu_pick()
+
+        self.camera_block.publish(self.camera)
 
         for obj, gfx in self.items:
-            M = obj.get_model_matrix()
+            self.shader.set_mat4("uModel", self._model_for(obj))
+            gfx.render()
 
-            # (opcional) feedback visual si el objeto está "seleccionado"
-            if getattr(obj, "selected", False):
-                M = M * glm.scale(glm.mat4(1.0), glm.vec3(1.05))
+        # pasada de IDs sólo si hay un pedido (click o hover)
+        if self.picker is not None:
+            if self.pick_mode == "gpu" and self.hover_enabled and self._mouse_uv is not None:
+                self.picker.request(*self._mouse_uv, tag="hover")
+            if self.picker.has_request:
+                self.picker.render_ids(self.items, self._model_for)
 
-            Mvp = P * V * M
-            self.shader.set_mat4("Mvp", Mvp)
-            gfx.render()
+    def _model_for(self, obj) -> glm.mat4:
+        M = obj.get_model_matrix()
+        # (opcional) feedback visual si el objeto está "seleccionado" o bajo el mouse
+        if getattr(obj, "selected", False):
+            M = M * glm.scale(glm.mat4(1.0), glm.vec3(1.05))
+        elif obj is self.hovered:
+            M = M * glm.scale(glm.mat4(1.0), glm.vec3(1.02))
+        return M
 
     # ---- tamaño de ventana ----
     def on_resize(self, width: int, height: int):
         # Lo llama Window.on_resize; actualizamos aspect de la cámara
         aspect = max(1e-5, width / max(1, height))
         self.camera.set_aspect(aspect)
+        self._size = (width, height)
+        if self.picker is not None:
+            self.picker.on_resize(width, height)
 
     # ---- picking por click ----
     def on_mouse_click(self, u: float, v: float):
         # u,v ∈ [0,1], ya con v invertida desde window.py
+        if self.pick_mode == "gpu" and self.picker is not None:
+            # se dibuja en este frame y se resuelve en el siguiente
+            self.picker.request(u, v, tag="click")
+            return
+
         origin, direction = self.camera.generate_ray(u, v)
         ray = Ray(origin, direction)
 
@@ -62,9 +97,41 @@ class Scene:
                     best_t = t
                     best_obj = obj
 
-        if best_obj is not None:
+        self._select(best_obj, f"t={best_t:.3f}")
+
+    def on_mouse_move(self, u: float, v: float):
+        self._mouse_uv = (u, v)
+
+    def on_key_press(self, symbol, modifiers):
+        from pyglet.window import key
+        if symbol == key.G and self._picker_factory is not None:
+            self.pick_mode = "cpu" if self.pick_mode == "gpu" else "gpu"
+            if self.pick_mode == "gpu" and self.picker is None:
+                self.picker = self._picker_factory()
+                if self._size is not None:
+                    self.picker.on_resize(*self._size)
+            print(f"[Picking] {self.pick_mode.upper()}")
+        elif symbol == key.V and self._picker_factory is not None:
+            self.hover_enabled = not self.hover_enabled
+            if not self.hover_enabled:
+                self.hovered = None
+            print(f"[Picking] hover {'on' if self.hover_enabled else 'off'}")
+
+    def _resolve_gpu_pick(self):
+        res = self.picker.poll()
+        if res is None:
+            return
+        tag, idx = res
+        obj = self.items[idx][0] if 0 <= idx < len(self.items) else None
+        if tag == "hover":
+            self.hovered = obj if self.hover_enabled else None
+        else:
+            self._select(obj, "gpu")
+
+    def _select(self, obj, info: str):
+        if obj is not None:
             # alternar "seleccionado" como feedback visual
-            best_obj.selected = not getattr(best_obj, "selected", False)
-            print(f"[HIT] → {getattr(best_obj, 'name', best_obj.__class__.__name__)}  t={best_t:.3f}")
+            obj.selected = not getattr(obj, "selected", False)
+            print(f"[HIT] → {getattr(obj, 'name', obj.__class__.__name__)}  {info}")
         else:
             print("[HIT] ninguno")
\ No newline at end of file
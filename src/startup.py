@@ -0,0 +1,57 @@
+# src/startup.py
+import os
+import time
+
+# referencia de respaldo si no podemos leer el arranque real del proceso
+_T_IMPORT = time.perf_counter()
+
+
+def seconds_since_process_start() -> float:
+    """
+    Segundos desde que arrancó el proceso (incluye el intérprete y los imports).
+    En Linux se lee de /proc; en otros sistemas se cuenta desde el import de este módulo.
+    """
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            stat = f.read()
+        # el nombre del proceso (campo 2) puede tener espacios: cortamos en el último ')'
+        fields = stat[stat.rindex(b")") + 2:].split()
+        start_ticks = int(fields[19])  # campo 22: starttime (ticks desde el boot)
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return time.perf_counter() - _T_IMPORT
+
+
+class LazyModes:
+    """
+    Registro perezoso de modos (escena TP4, raytracing, ...).
+    Cada modo se registra con una fábrica y se construye recién la primera vez
+    que se activa (shaders, VAOs, HUD); warm_up() permite construir los que
+    falten más tarde, por ejemplo después del primer frame.
+    """
+    def __init__(self):
+        self._factories = {}
+        self._built = {}
+
+    def register(self, name: str, factory):
+        self._factories[name] = factory
+
+    def is_built(self, name: str) -> bool:
+        return name in self._built
+
+    def get(self, name: str):
+        if name not in self._built:
+            t0 = time.perf_counter()
+            self._built[name] = self._factories[name]()
+            print(f"[Startup] modo '{name}' construido en {(time.perf_counter() - t0) * 1000:.1f} ms")
+        return self._built[name]
+
+    def warm_up(self, dt: float = 0.0):
+        """Construye el próximo modo pendiente (uno por llamada, para no trabar frames)."""
+        for name in self._factories:
+            if name not in self._built:
+                self.get(name)
+                return True
+        return False
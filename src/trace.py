@@ -0,0 +1,168 @@
+# src/trace.py
+"""
+Grabación / reproducción de entrada para corridas de performance reproducibles.
+
+InputRecorder se engancha a la ventana (push_handlers) y guarda teclas, mouse,
+resize y el dt de cada tick del loop de update en un archivo binario compacto:
+    header : magic "CGTR", versión u32, ancho u32, alto u32
+    eventos: registros empaquetados de EVENT_DTYPE (25 bytes c/u: EVENT_DTYPE.itemsize)
+
+TraceReplayer vuelve a inyectar esos eventos en la ventana con un dt fijo,
+dibuja cada frame en un framebuffer offscreen y mide su tiempo (opcionalmente
+con hash de la imagen), así dos builds se comparan frame a frame con el mismo
+input. Offscreen porque una ventana oculta o headless no tiene píxeles propios.
+"""
+import hashlib
+import struct
+import time
+from pathlib import Path
+
+import numpy as np
+from pyglet.event import EventDispatcher
+
+MAGIC = b"CGTR"
+VERSION = 1
+_HEADER = struct.Struct("<4sIII")
+
+EVENT_DTYPE = np.dtype([
+    ("frame", "<u4"),   # tick del loop de update en el que ocurrió
+    ("kind", "u1"),
+    ("a", "<i4"), ("b", "<i4"), ("c", "<i4"), ("d", "<i4"),
+    ("dt", "<f4"),      # sólo para TICK: dt real de la sesión grabada
+])
+
+TICK, KEY_PRESS, KEY_RELEASE, MOUSE_PRESS, MOUSE_MOTION, RESIZE = range(6)
+
+
+class InputRecorder:
+    """Handler de eventos para la ventana: win.push_handlers(recorder)."""
+    def __init__(self, path, width: int, height: int):
+        self.path = Path(path)
+        self.size = (int(width), int(height))
+        self.frame = 0
+        self._events = []
+
+    def _add(self, kind, a=0, b=0, c=0, d=0, dt=0.0):
+        self._events.append((self.frame, kind, int(a), int(b), int(c), int(d), float(dt)))
+
+    # ---- eventos de ventana (no los consumen: devuelven None) ----
+    def on_key_press(self, symbol, modifiers):
+        self._add(KEY_PRESS, symbol, modifiers)
+
+    def on_key_release(self, symbol, modifiers):
+        self._add(KEY_RELEASE, symbol, modifiers)
+
+    def on_mouse_press(self, x, y, button, modifiers):
+        self._add(MOUSE_PRESS, x, y, button, modifiers)
+
+    def on_mouse_motion(self, x, y, dx, dy):
+        self._add(MOUSE_MOTION, x, y, dx, dy)
+
+    def on_resize(self, width, height):
+        self._add(RESIZE, width, height)
+
+    # ---- loop ----
+    def tick(self, dt: float):
+        """Llamar al principio de cada update: cierra el frame actual."""
+        self._add(TICK, dt=dt)
+        self.frame += 1
+
+    def save(self):
+        events = np.array(self._events, dtype=EVENT_DTYPE)
+        with open(self.path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, *self.size))
+            f.write(events.tobytes())
+        print(f"[Trace] {self.frame} frames, {len(events)} eventos → {self.path}")
+
+
+def load_trace(path):
+    """Devuelve ((ancho, alto), eventos) con eventos como array de EVENT_DTYPE."""
+    data = Path(path).read_bytes()
+    magic, version, w, h = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: no es un trace válido (magic={magic!r}, versión={version})")
+    events = np.frombuffer(data, dtype=EVENT_DTYPE, offset=_HEADER.size)
+    return (w, h), events
+
+
+class TraceReplayer:
+    """
+    Reproduce un trace sobre la ventana sin loop de pyglet:
+    por frame → eventos grabados, update(dt fijo), on_draw, ctx.finish().
+    """
+    def __init__(self, win, update, trace_path, dt: float = 1 / 60, hash_frames: bool = False):
+        self.win = win
+        self.update = update
+        self.dt = float(dt)
+        self.hash_frames = hash_frames
+        self.size, self.events = load_trace(trace_path)
+        self.results = []   # (frame, ms, hash o "")
+        self.target = None
+        self._make_target(*self.size)
+
+    def _make_target(self, w, h):
+        size = (max(1, w), max(1, h))
+        old = self.target
+        if old is not None and old.size == size:
+            return
+        # el nuevo queda atado antes de liberar el viejo: liberar el framebuffer
+        # en uso deja un GL_INVALID_OPERATION pendiente para el próximo clear()
+        self.target = self.win.ctx.simple_framebuffer(size)
+        self.target.use()
+        if old is not None:
+            old.release()
+
+    def _send(self, name, *args):
+        # fuera de pyglet.app.run la ventana encola sus eventos: despachar directo
+        EventDispatcher.dispatch_event(self.win, name, *args)
+
+    def _dispatch(self, e):
+        kind, a, b, c, d = int(e["kind"]), int(e["a"]), int(e["b"]), int(e["c"]), int(e["d"])
+        if kind == KEY_PRESS:
+            self._send("on_key_press", a, b)
+        elif kind == KEY_RELEASE:
+            self._send("on_key_release", a, b)
+        elif kind == MOUSE_PRESS:
+            self._send("on_mouse_press", a, b, c, d)
+        elif kind == MOUSE_MOTION:
+            self._send("on_mouse_motion", a, b, c, d)
+        elif kind == RESIZE:
+            self.win.set_size(a, b)
+            self._make_target(a, b)
+            self._send("on_resize", a, b)
+
+    def run(self):
+        ticks = np.nonzero(self.events["kind"] == TICK)[0]
+        start = 0
+        for frame, end in enumerate(ticks):
+            t0 = time.perf_counter()
+            self.win.switch_to()
+            self.target.use()
+            for e in self.events[start:end]:
+                self._dispatch(e)
+            start = end + 1
+
+            self.update(self.dt)
+            self._send("on_draw")
+            self.win.ctx.finish()
+            ms = (time.perf_counter() - t0) * 1000.0
+
+            digest = ""
+            if self.hash_frames:
+                digest = hashlib.blake2b(self.target.read(components=3), digest_size=8).hexdigest()
+            self.results.append((frame, ms, digest))
+        return self.results
+
+    def summary(self) -> str:
+        if not self.results:
+            return "[Replay] trace vacío"
+        ms = np.array([r[1] for r in self.results])
+        return (f"[Replay] {len(ms)} frames  media={ms.mean():.2f} ms  "
+                f"p50={np.percentile(ms, 50):.2f}  p95={np.percentile(ms, 95):.2f}  max={ms.max():.2f}")
+
+    def write_report(self, path):
+        """CSV frame,ms,hash: dos builds se comparan con un diff de la columna hash."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("frame,ms,hash\n")
+            for frame, ms, digest in self.results:
+                f.write(f"{frame},{ms:.3f},{digest}\n")
@@ -3,12 +3,17 @@ import moderngl
 
 
 class Window(pyglet.window.Window):
-    def __init__(self, width=1280, height=720, title="Parcial CG 2025"):
-        super().__init__(width=width, height=height, caption=title, resizable=True)
+    def __init__(self, width=1280, height=720, title="Parcial CG 2025", visible=True):
+        super().__init__(width=width, height=height, caption=title, resizable=True, visible=visible)
         self.ctx = moderngl.create_context()
         self.ctx.viewport = (0, 0, width, height)
         self.scene = None
         self.renderer = None
+        self._first_frame_callbacks = []
+
+    def call_after_first_frame(self, fn):
+        """Registra fn() para ejecutarse una vez, al terminar de dibujar el primer frame."""
+        self._first_frame_callbacks.append(fn)
 
     def set_scene(self, scene):
         self.scene = scene
@@ -27,6 +32,11 @@ class Window(pyglet.window.Window):
         elif self.renderer:
             self.renderer.render()
 
+        if self._first_frame_callbacks:
+            callbacks, self._first_frame_callbacks = self._first_frame_callbacks, []
+            for fn in callbacks:
+                fn()
+
     def on_resize(self, width, height):
         super().on_resize(width, height)
         self.ctx.viewport = (0, 0, width, height)
@@ -43,6 +53,12 @@ class Window(pyglet.window.Window):
         elif self.renderer and hasattr(self.renderer, "on_mouse_press"):
             self.renderer.on_mouse_press(x, y, button, modifiers)
 
+    def on_mouse_motion(self, x, y, dx, dy):
+        if self.scene and hasattr(self.scene, "on_mouse_move"):
+            u = x / max(1, self.width)
+            v = 1.0 - (y / max(1, self.height))
+            self.scene.on_mouse_move(u, v)
+
     def on_key_press(self, symbol, modifiers):
         if self.scene and hasattr(self.scene, "on_key_press"):
             self.scene.on_key_press(symbol, modifiers)